@@ -2,4 +2,5 @@ from . import grips
 from . import shadow
 from . import window
 from . import modes
+from . import profiler
 from .window import CWindow
\ No newline at end of file
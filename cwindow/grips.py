@@ -1,64 +1,156 @@
 from PyQt6 import QtWidgets, QtCore, QtGui
 
 
+Edge = QtCore.Qt.Edge
+Corner = QtCore.Qt.Corner
+
+# window edges moved by the grip
+_GRIP_EDGES = {
+    Edge.LeftEdge: (Edge.LeftEdge,),
+    Edge.TopEdge: (Edge.TopEdge,),
+    Edge.RightEdge: (Edge.RightEdge,),
+    Edge.BottomEdge: (Edge.BottomEdge,),
+    Corner.TopLeftCorner: (Edge.TopEdge, Edge.LeftEdge),
+    Corner.TopRightCorner: (Edge.TopEdge, Edge.RightEdge),
+    Corner.BottomRightCorner: (Edge.BottomEdge, Edge.RightEdge),
+    Corner.BottomLeftCorner: (Edge.BottomEdge, Edge.LeftEdge),
+}
+
+_GRIP_CURSORS = {
+    Edge.LeftEdge: QtCore.Qt.CursorShape.SizeHorCursor,
+    Edge.TopEdge: QtCore.Qt.CursorShape.SizeVerCursor,
+    Edge.RightEdge: QtCore.Qt.CursorShape.SizeHorCursor,
+    Edge.BottomEdge: QtCore.Qt.CursorShape.SizeVerCursor,
+    Corner.TopLeftCorner: QtCore.Qt.CursorShape.SizeFDiagCursor,
+    Corner.TopRightCorner: QtCore.Qt.CursorShape.SizeBDiagCursor,
+    Corner.BottomRightCorner: QtCore.Qt.CursorShape.SizeFDiagCursor,
+    Corner.BottomLeftCorner: QtCore.Qt.CursorShape.SizeBDiagCursor,
+}
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return max(low, min(value, high))
+
+
+def _apply_increment(value: int, base: int, increment: int, low: int) -> int:
+    if increment <= 1:
+        return value
+    value = base + (value - base) // increment * increment
+    while value < low:
+        value += increment
+    return value
+
+
+def solve_geometry(
+        window: QtWidgets.QWidget,
+        size: QtCore.QSize,
+        edges: tuple[QtCore.Qt.Edge, ...]) -> QtCore.QRect:
+    """
+    Computes the legal window geometry for the requested size in one step.
+    Respects min and max size, sizeIncrement, baseSize and window aspect_ratio (width / height).
+    Window sides opposite to the moved edges stay anchored
+    """
+
+    geo = window.geometry()
+    horizontal = Edge.LeftEdge in edges or Edge.RightEdge in edges
+    vertical = Edge.TopEdge in edges or Edge.BottomEdge in edges
+    min_w, max_w = window.minimumWidth(), window.maximumWidth()
+    min_h, max_h = window.minimumHeight(), window.maximumHeight()
+    inc, base = window.sizeIncrement(), window.baseSize()
+    ratio = getattr(window, "aspect_ratio", None)
+
+    width = size.width() if horizontal else geo.width()
+    height = size.height() if vertical else geo.height()
+
+    if ratio:
+        # corner grips follow the bigger change
+        by_height = vertical and (
+            not horizontal or
+            abs(height - geo.height()) * ratio > abs(width - geo.width()))
+        if by_height:
+            width = round(height * ratio)
+        # width range allowed by both width and height limits
+        low = max(min_w, round(min_h * ratio))
+        high = min(max_w, round(max_h * ratio))
+        if low > high:
+            low, high = min_w, max_w
+        width = _clamp(width, low, high)
+        # increment steps may overshoot a range narrower than the increment
+        width = _clamp(_apply_increment(width, base.width(), inc.width(), low), low, high)
+        height = _clamp(round(width / ratio), min_h, max_h)
+    else:
+        width = _clamp(width, min_w, max_w)
+        width = _clamp(_apply_increment(width, base.width(), inc.width(), min_w), min_w, max_w)
+        height = _clamp(height, min_h, max_h)
+        height = _clamp(_apply_increment(height, base.height(), inc.height(), min_h), min_h, max_h)
+
+    x, y = geo.x(), geo.y()
+    if Edge.LeftEdge in edges:
+        x += geo.width() - width
+    if Edge.TopEdge in edges:
+        y += geo.height() - height
+    return QtCore.QRect(x, y, width, height)
+
+
 class SideGrip(QtWidgets.QWidget):
 
     """Grips that allows to resize frameless window"""
 
+    # resize gesture boundaries
+    pressed = QtCore.pyqtSignal()
+    released = QtCore.pyqtSignal()
+
     def __init__(
             self,
             parent: QtWidgets.QMainWindow,
-            edge: QtCore.Qt.Edge):
+            edge: QtCore.Qt.Edge | QtCore.Qt.Corner):
 
         QtWidgets.QWidget.__init__(self, parent)
 
-        if edge == QtCore.Qt.Edge.LeftEdge:
-            self.setCursor(QtCore.Qt.CursorShape.SizeHorCursor)
-            self.resize_func = self.resize_left
-        elif edge == QtCore.Qt.Edge.TopEdge:
-            self.setCursor(QtCore.Qt.CursorShape.SizeVerCursor)
-            self.resize_func = self.resize_top
-        elif edge == QtCore.Qt.Edge.RightEdge:
-            self.setCursor(QtCore.Qt.CursorShape.SizeHorCursor)
-            self.resize_func = self.resize_right
-        else:
-            self.setCursor(QtCore.Qt.CursorShape.SizeVerCursor)
-            self.resize_func = self.resize_bottom
-
+        self.setCursor(_GRIP_CURSORS[edge])
+        self.edges = _GRIP_EDGES[edge]
         self.mouse_pos = None
 
-    def resize_left(self, delta: QtCore.QPoint):
+    def resize_window(self, delta: QtCore.QPoint):
+        """resizes window with exactly one setGeometry call"""
         window = self.window()
-        width = max(window.minimumWidth(), window.width() - delta.x())
         geo = window.geometry()
-        geo.setLeft(geo.right() - width)
-        window.setGeometry(geo)
-
-    def resize_top(self, delta: QtCore.QPoint):
-        window = self.window()
-        height = max(window.minimumHeight(), window.height() - delta.y())
-        geo = window.geometry()
-        geo.setTop(geo.bottom() - height)
-        window.setGeometry(geo)
-
-    def resize_right(self, delta: QtCore.QPoint):
-        window = self.window()
-        width = max(window.minimumWidth(), window.width() + delta.x())
-        window.resize(width, window.height())
-
-    def resize_bottom(self, delta: QtCore.QPoint):
-        window = self.window()
-        height = max(window.minimumHeight(), window.height() + delta.y())
-        window.resize(window.width(), height)
+        width, height = geo.width(), geo.height()
+        if Edge.LeftEdge in self.edges:
+            width -= delta.x()
+        if Edge.RightEdge in self.edges:
+            width += delta.x()
+        if Edge.TopEdge in self.edges:
+            height -= delta.y()
+        if Edge.BottomEdge in self.edges:
+            height += delta.y()
+        target = solve_geometry(window, QtCore.QSize(width, height), self.edges)
+        if target != geo:
+            window.setGeometry(target)
 
     def mousePressEvent(self, event: QtGui.QMouseEvent):
         if event.button() == QtCore.Qt.MouseButton.LeftButton:
             self.mouse_pos = event.pos()
+            self.pressed.emit()
 
     def mouseMoveEvent(self, event: QtGui.QMouseEvent):
         if self.mouse_pos is not None:
             delta = event.pos() - self.mouse_pos
-            self.resize_func(delta)
+            self.resize_window(delta)
 
     def mouseReleaseEvent(self, event: QtGui.QMouseEvent):
-        self.mouse_pos = None
+        if self.mouse_pos is not None:
+            self.mouse_pos = None
+            self.released.emit()
+
+
+class CornerGrip(SideGrip):
+
+    """Corner grips resizing frameless window in both directions"""
+
+    def __init__(
+            self,
+            parent: QtWidgets.QMainWindow,
+            corner: QtCore.Qt.Corner):
+
+        SideGrip.__init__(self, parent, corner)
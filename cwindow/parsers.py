@@ -1,8 +1,21 @@
-from dataclasses import dataclass
+import copy
+from dataclasses import dataclass, fields
 
 from PyQt6 import QtCore, QtWidgets, QtGui
 
 
+# screen edges (EventParser flags) each side consists of
+_SIDE_EDGES = {
+    QtCore.Qt.Edge.LeftEdge: ("left",),
+    QtCore.Qt.Edge.TopEdge: ("top",),
+    QtCore.Qt.Edge.RightEdge: ("right",),
+    QtCore.Qt.Edge.BottomEdge: ("bottom",),
+    QtCore.Qt.Corner.TopLeftCorner: ("top", "left"),
+    QtCore.Qt.Corner.TopRightCorner: ("top", "right"),
+    QtCore.Qt.Corner.BottomRightCorner: ("bottom", "right"),
+    QtCore.Qt.Corner.BottomLeftCorner: ("bottom", "left"),
+}
+
 @dataclass
 class ScreenAreas():
     entire: QtCore.QRect
@@ -15,71 +28,94 @@ class ScreenAreas():
     bottomright: QtCore.QRect
     bottomleft: QtCore.QRect
 
+    def copy(self) -> "ScreenAreas":
+        return ScreenAreas(*(QtCore.QRect(getattr(self, f.name)) for f in fields(self)))
 
-class ScreenParser(QtWidgets.QWidget):
+
+def _device_half(length: int, ratio: float) -> int:
+    """
+    returns logical offset nearest to the half of length,
+    which lands on a device pixel boundary at the given device pixel ratio
+    """
+    half = length // 2
+    # fractional ratios hit device pixel boundaries every few logical pixels
+    # (every 4th at 125%, every 2nd at 150%)
+    for step in range(8):
+        for offset in (half - step, half + step):
+            device = offset * ratio
+            if abs(device - round(device)) < 1e-6:
+                return offset
+    return half
+
+
+class ScreenParser(QtCore.QObject):
 
     """
     Parsers QScreen:
     areas - QRect objects marks screen parts;
     """
 
+    # parsed areas by screen name, geometry and device pixel ratio,
+    # the oldest entries are dropped after cache_size
+    _cache: dict[tuple, ScreenAreas] = {}
+    cache_size = 16
+
     _screen: QtGui.QScreen
 
     areas: ScreenAreas
 
-    def __init__(self, screen: QtGui.QScreen):
-        QtWidgets.QWidget.__init__(self)
+    def __init__(self, screen: QtGui.QScreen, parent: QtCore.QObject = None):
+        # parented to the window, so it is destroyed together with it
+        QtCore.QObject.__init__(self, parent)
         self._screen = screen
         self._parse_screen()
 
-    def _parse_screen(self):
-        def geo(): return self._screen.geometry()
-        x2 = w2 = int(geo().width()/2)
-        y2 = h2 = int(geo().height()/2)
-
-        self.areas = ScreenAreas(
-            geo(),
-            geo(),
-            geo(),
-            geo(),
-            geo(),
-            geo(),
-            geo(),
-            geo(),
-            geo())
-
-        self.areas.left.setWidth(w2)
-
-        self.areas.right.setX(x2)
-        self.areas.right.setWidth(w2)
-
-        self.areas.bottom.setY(y2)
-        self.areas.bottom.setHeight(h2)
-
-        self.areas.top.setHeight(h2)
-
-        self.areas.topright.setX(x2)
-        self.areas.topright.setWidth(w2)
-        self.areas.topright.setHeight(h2)
-
-        self.areas.topleft.setWidth(w2)
-        self.areas.topleft.setHeight(h2)
-
-        self.areas.bottomright.setX(x2)
-        self.areas.bottomright.setY(y2)
-        self.areas.bottomright.setHeight(h2)
-        self.areas.bottomright.setWidth(w2)
-
-        self.areas.bottomleft.setY(y2)
-        self.areas.bottomleft.setWidth(w2)
-        self.areas.bottomleft.setHeight(h2)
-
+    def set_screen(self, screen: QtGui.QScreen):
+        """updates areas for the screen window is currently on"""
+        self._screen = screen
+        self._parse_screen()
 
-class EventParser(QtWidgets.QWidget):
+    def _parse_screen(self):
+        geo = self._screen.geometry()
+        ratio = self._screen.devicePixelRatio()
+        key = (self._screen.name(), geo.getRect(), ratio)
+        if key not in self._cache:
+            while len(self._cache) >= self.cache_size:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = self._split_screen(geo, ratio)
+        # QRect is mutable, every parser gets its own areas
+        self.areas = self._cache[key].copy()
+
+    @staticmethod
+    def _split_screen(geo: QtCore.QRect, ratio: float) -> ScreenAreas:
+        # halves share the boundary, so tiles neither overlap nor leave gaps
+        x, y, w, h = geo.getRect()
+        w1 = _device_half(w, ratio)
+        h1 = _device_half(h, ratio)
+        x2, y2 = x + w1, y + h1
+        w2, h2 = w - w1, h - h1
+
+        def rect(*args): return QtCore.QRect(*args)
+
+        return ScreenAreas(
+            entire=rect(geo),
+            top=rect(x, y, w, h1),
+            right=rect(x2, y, w2, h),
+            bottom=rect(x, y2, w, h2),
+            left=rect(x, y, w1, h),
+            topright=rect(x2, y, w2, h1),
+            topleft=rect(x, y, w1, h1),
+            bottomright=rect(x2, y2, w2, h2),
+            bottomleft=rect(x, y2, w1, h2))
+
+
+class EventParser():
 
     """
     Parses QMouseEvent:
     point - absolute event position;
+    local_point - event position relative to the widget received it;
+    timestamp - event time in milliseconds;
     relative_pos - event position relative to window width and height;
     side - indicates that event happend near the screen edge or corner;
     screen_area - geometry for WindowShadow.show_ method;
@@ -87,21 +123,27 @@ class EventParser(QtWidgets.QWidget):
 
     event: QtGui.QMouseEvent
 
+    # distance from the screen edge (px) that triggers gestures
+    edge_margin: int = 5
+
     top: bool = False
     left: bool = False
     bottom: bool = False
     right: bool = False
 
     point: QtCore.QPoint
+    local_point: QtCore.QPoint
+    timestamp: int
     relative_pos: tuple[float, float]
     side: QtCore.Qt.Edge | QtCore.Qt.Corner = None
     screen_area: QtCore.QRect
 
     def __init__(self, titlebar: QtWidgets.QFrame, event: QtGui.QMouseEvent):
-        QtWidgets.QWidget.__init__(self)
         self._window = titlebar.window()
         self._screen: ScreenParser = titlebar._screen
         self.event = event
+        # Qt reuses event objects, so everything needed later is copied here
+        self._get_event_absolute_pos()
         self.parse_event()
 
     def _drop_to_defaults(self):
@@ -109,31 +151,51 @@ class EventParser(QtWidgets.QWidget):
         self.left = False
         self.bottom = False
         self.right = False
-        self.point = None
         self.side = None
-        self.rect = None
-
-    def parse_event(self):
+        self.screen_area = None
+
+    def parse_event(
+            self,
+            held_side: QtCore.Qt.Edge | QtCore.Qt.Corner = None,
+            margin: int = None):
+        """
+        held_side - side of the already shown shadow;
+        margin - overrides edge_margin for the held_side edges only, allows wider zones
+        for the shown shadow without widening the other edges
+        """
         self._drop_to_defaults()
-        self._get_event_absolute_pos()
         self._get_event_relative_pos()
-        self._get_event_edges()
+        margins = dict.fromkeys(("top", "left", "bottom", "right"), self.edge_margin)
+        if held_side is not None and margin is not None:
+            margins.update(dict.fromkeys(_SIDE_EDGES[held_side], margin))
+        self._get_event_edges(margins)
         self._translate_edges_to_qt()
         self._get_screen_area()
 
+    def predict(self, velocity: tuple[float, float], lookahead: int) -> "EventParser":
+        """
+        returns parser for the point cursor will reach in lookahead ms
+        moving with velocity (px/ms)
+        """
+        vx, vy = velocity
+        parser = copy.copy(self)
+        parser.point = self.point + QtCore.QPoint(round(vx * lookahead), round(vy * lookahead))
+        parser.parse_event()
+        return parser
+
     def _get_event_absolute_pos(self):
-        pos = self.event.pos()
-        x, y = pos.x(), pos.y()
-        opos = self._window.pos()
-        x += opos.x()
-        y += opos.y()
-        self.point = QtCore.QPoint(x, y)
+        # global position does not depend on the window position,
+        # which lags behind the cursor during gestures
+        self.point = self.event.globalPosition().toPoint()
+        self.local_point = self.event.position().toPoint()
+        self.timestamp = self.event.timestamp()
 
-    def _get_event_edges(self):
+    def _get_event_edges(self, margins: dict[str, int]):
         pos = self.point
         x, y = pos.x(), pos.y()
-        geo = self.screen().geometry()
-        top, left, right, bottom = 5, 5, geo.right()-5, geo.bottom()-5
+        geo = self._screen.areas.entire
+        top, left = geo.top()+margins["top"], geo.left()+margins["left"]
+        right, bottom = geo.right()-margins["right"], geo.bottom()-margins["bottom"]
         if x < left:
             self.left = True
         if x > right:
@@ -180,7 +242,7 @@ class EventParser(QtWidgets.QWidget):
             self.screen_area = self._screen.areas.entire
 
     def _get_event_relative_pos(self):
-        dpos = self.event.pos()
+        dpos = self.local_point
         rx = dpos.x() / self._window.width()
         ry = dpos.y() / self._window.height()
         self.relative_pos = (rx, ry)
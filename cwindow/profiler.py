@@ -0,0 +1,154 @@
+"""
+module with sampling profiler capturing CWindow gestures
+"""
+
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+
+
+class GestureProfiler():
+    """
+    Samples python stacks of the GUI thread from a background thread while gesture lasts.
+    Each gesture is written to output_dir as collapsed stacks (flamegraph.pl, speedscope)
+    or as speedscope JSON, both weighted by the sampled time
+    """
+
+    formats = ("collapsed", "speedscope")
+
+    # seconds between samples, the real interval is longer and is measured
+    interval = 0.002
+    # frames kept from the stack top
+    max_depth = 128
+    # distinct stacks kept per gesture, others are counted as truncated
+    max_stacks = 2048
+    # samples per gesture, sampling stops after it
+    max_samples = 50000
+
+    def __init__(self, output_dir: str, format: str = "collapsed"):
+        if format not in self.formats:
+            raise ValueError(f"unknown profile format: {format}")
+        self.output_dir = output_dir
+        self.format = format
+        # profiler is created in the GUI thread
+        self._thread_id = threading.get_ident()
+        self._stacks: Counter[tuple[str, ...]] = Counter()
+        # seconds each stack was sampled for
+        self._times: Counter[tuple[str, ...]] = Counter()
+        self._truncated = 0
+        self._truncated_time = 0.0
+        self._samples = 0
+        self._gesture: str = None
+        self._started = 0.0
+        self._stop = threading.Event()
+        self._sampler: threading.Thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._sampler is not None
+
+    def start(self, gesture: str):
+        """starts sampling, gesture is used in the output file name"""
+        if self.is_running:
+            return
+        self._stacks.clear()
+        self._times.clear()
+        self._truncated = 0
+        self._truncated_time = 0.0
+        self._samples = 0
+        self._gesture = gesture
+        self._started = time.time()
+        self._stop.clear()
+        self._sampler = threading.Thread(
+            target=self._sample, name="cwindow-gesture-profiler", daemon=True)
+        self._sampler.start()
+
+    def stop(self) -> str | None:
+        """stops sampling and returns path of the written profile"""
+        if not self.is_running:
+            return None
+        self._stop.set()
+        self._sampler.join()
+        self._sampler = None
+        path = self._write() if self._samples else None
+        self._stacks.clear()
+        self._times.clear()
+        return path
+
+    def _sample(self):
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval) and self._samples < self.max_samples:
+            frame = sys._current_frames().get(self._thread_id)
+            # sample stands for the time passed since the previous one
+            now = time.perf_counter()
+            elapsed, last = now - last, now
+            if frame is not None:
+                self._add(frame, elapsed)
+            # frames must not outlive the sample
+            del frame
+
+    def _add(self, frame, elapsed: float):
+        stack = []
+        while frame is not None and len(stack) < self.max_depth:
+            code = frame.f_code
+            # collapsed format uses ";" as the frame separator
+            name = f"{code.co_name} ({code.co_filename}:{code.co_firstlineno})"
+            stack.append(name.replace(";", ","))
+            frame = frame.f_back
+        stack = tuple(reversed(stack))
+        self._samples += 1
+        if stack in self._stacks or len(self._stacks) < self.max_stacks:
+            self._stacks[stack] += 1
+            self._times[stack] += elapsed
+        else:
+            self._truncated += 1
+            self._truncated_time += elapsed
+
+    def _stack_counts(self) -> list[tuple[tuple[str, ...], int, float]]:
+        """returns stacks with their samples number and sampled seconds"""
+        counts = [(stack, count, self._times[stack]) for stack, count in self._stacks.items()]
+        if self._truncated:
+            counts.append((("[truncated]",), self._truncated, self._truncated_time))
+        return counts
+
+    def _write(self) -> str:
+        os.makedirs(self.output_dir, exist_ok=True)
+        stamp = time.strftime("%Y%m%d-%H%M%S", time.localtime(self._started))
+        millis = int(self._started * 1000) % 1000
+        name = f"{self._gesture}-{stamp}-{millis:03d}"
+        if self.format == "collapsed":
+            path = os.path.join(self.output_dir, f"{name}.folded")
+            with open(path, "w", encoding="utf-8") as file:
+                # collapsed weights are integers, microseconds keep short samples visible
+                for stack, _, seconds in self._stack_counts():
+                    file.write(f"{';'.join(stack)} {max(1, round(seconds * 1e6))}\n")
+        else:
+            path = os.path.join(self.output_dir, f"{name}.speedscope.json")
+            with open(path, "w", encoding="utf-8") as file:
+                json.dump(self._speedscope(name), file)
+        return path
+
+    def _speedscope(self, name: str) -> dict:
+        frames: dict[str, int] = {}
+        samples, weights = [], []
+        for stack, _, seconds in self._stack_counts():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(seconds * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "cwindow",
+            "shared": {"frames": [{"name": frame} for frame in frames]},
+            "profiles": [{
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": sum(weights),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
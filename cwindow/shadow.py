@@ -7,15 +7,30 @@ class WindowShadow(QtWidgets.QMainWindow):
     translucent rectangle showing window target geometry
     """
 
-    def __init__(self, color: QtGui.QColor):
-        QtWidgets.QMainWindow.__init__(self)
-        self.setWindowFlags(QtCore.Qt.WindowType.FramelessWindowHint)
+    def __init__(self, color: QtGui.QColor, parent: QtWidgets.QWidget = None):
+        # parented to the window, so it is destroyed together with it.
+        # Window flag keeps the shadow a separate top-level window
+        QtWidgets.QMainWindow.__init__(self, parent)
+        self.setWindowFlags(
+            QtCore.Qt.WindowType.Window |
+            QtCore.Qt.WindowType.FramelessWindowHint)
         self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TranslucentBackground)
         self.setCentralWidget(QtWidgets.QWidget())
         r, g, b, a = color.getRgb()
         self.centralWidget().setStyleSheet(
             f"background-color: rgba({r}, {g}, {b}, {a}); border:none;")
 
+    def prepare_(self, rect: QtCore.QRect):
+        """
+        creates native window and sets geometry without showing the shadow,
+        so the following show_ call is cheap
+        """
+        self.winId()
+        if self.geometry() != rect:
+            self.setGeometry(rect)
+
     def show_(self, rect: QtCore.QRect):
-        self.setGeometry(rect)
-        self.show()
+        if self.geometry() != rect:
+            self.setGeometry(rect)
+        if not self.isVisible():
+            self.show()
@@ -1,8 +1,12 @@
-from PyQt6 import QtCore, QtGui, QtWidgets
+import os
+from contextlib import contextmanager
 
-from .grips import SideGrip
+from PyQt6 import QtCore, QtGui, QtWidgets, sip
+
+from .grips import SideGrip, CornerGrip
 from .shadow import WindowShadow
 from .parsers import EventParser, ScreenParser
+from .profiler import GestureProfiler
 from . import modes
 
 
@@ -41,10 +45,17 @@ class CWindow(QtWidgets.QMainWindow):
     grip_size = 12
     titlebar_height = 44
     shadow_color = QtGui.QColor(0, 0, 0, 100)
+    # width / height ratio kept by the grips, None means free resizing
+    aspect_ratio: float = None
+    # key sequence toggling gesture profiling (e.g. "Ctrl+Alt+P"), None disables the hotkey
+    profiling_hotkey: str = None
+    # cursor movement is extrapolated for snap_lookahead ms to prepare the shadow in advance
+    snap_lookahead = 80
+    # shown shadow hides only when cursor is snap_release_margin px away from its screen edges
+    snap_release_margin = 24
 
     title_bar: QtWidgets.QFrame
     content: QtWidgets.QFrame
-    shadow: WindowShadow
 
     gesture_mode: modes.GestureResizeMode = modes.GestureResizeModes.shrink_as_possible
     gesture_sides: modes.SidesUsingMode = modes.SideUsingModes.whole
@@ -72,9 +83,35 @@ class CWindow(QtWidgets.QMainWindow):
         self._is_pressed = False
         # _is_gestured indicates that window was resized with moving to screen edge gesture
         self._is_gestured = False
-        self.shadow = WindowShadow(self.shadow_color)
+        # cursor velocity (px/ms) during titlebar gesture
+        self._velocity = (0.0, 0.0)
+        self._last_move: EventParser = None
+        # shadow is created on demand and released on close
+        self._shadow: WindowShadow = None
+        # side the shown shadow belongs to
+        self._shadow_side: QtCore.Qt.Edge | QtCore.Qt.Corner = None
         self._normal_size = self.size()
-        self._screen = ScreenParser(self.screen())
+        # nesting level of geometry_transaction
+        self._transaction_depth = 0
+        self._transaction_size = QtCore.QSize()
+        self._transaction_suspended = False
+        self._transaction_updates = True
+        self._screen = ScreenParser(self.screen(), self)
+
+        # windows following this one when it is moved by the titlebar
+        self._linked: list[QtWidgets.QWidget] = []
+        # pending linked windows changes, applied once per event loop iteration
+        self._group_delta = QtCore.QPoint()
+        self._group_geometries: dict[int, QtCore.QRect] = {}
+        # linked windows offsets to this window and sizes before snapping
+        self._group_normal: list[tuple[QtWidgets.QWidget, QtCore.QPoint, QtCore.QSize]] = []
+        # linked windows moves and batches applied, allow to measure group drags
+        self.group_move_count = 0
+        self.group_batch_count = 0
+        self._group_timer = QtCore.QTimer(self)
+        self._group_timer.setSingleShot(True)
+        self._group_timer.setInterval(0)
+        self._group_timer.timeout.connect(self._flush_group_moves)
 
         self.content = QtWidgets.QFrame(self)
         self.content.setSizePolicy(
@@ -90,9 +127,202 @@ class CWindow(QtWidgets.QMainWindow):
             SideGrip(self, QtCore.Qt.Edge.RightEdge),
             SideGrip(self, QtCore.Qt.Edge.BottomEdge),
         ]
-        self.corner_grips = [QtWidgets.QSizeGrip(self) for _ in range(4)]
-        for grip in self.corner_grips:
-            grip.setStyleSheet("background-color: rgba(0,0,0,0)")
+        self.corner_grips = [
+            CornerGrip(self, QtCore.Qt.Corner.TopLeftCorner),
+            CornerGrip(self, QtCore.Qt.Corner.TopRightCorner),
+            CornerGrip(self, QtCore.Qt.Corner.BottomRightCorner),
+            CornerGrip(self, QtCore.Qt.Corner.BottomLeftCorner),
+        ]
+        for grip in self.side_grips + self.corner_grips:
+            grip.pressed.connect(self._grip_pressed)
+            grip.released.connect(self._end_gesture)
+
+        # samples gestures when profiling is enabled
+        self._profiler: GestureProfiler = None
+        if self.profiling_hotkey:
+            shortcut = QtGui.QShortcut(QtGui.QKeySequence(self.profiling_hotkey), self)
+            shortcut.activated.connect(self.toggle_profiling)
+
+    @property
+    def shadow(self) -> WindowShadow:
+        """translucent window showing the gesture target geometry"""
+        if self._shadow is None:
+            self._shadow = WindowShadow(self.shadow_color, self)
+        return self._shadow
+
+    def _is_shadow_visible(self) -> bool:
+        return self._shadow is not None and self._shadow.isVisible()
+
+    def _hide_shadow(self):
+        self._shadow_side = None
+        if self._shadow is not None:
+            self._shadow.hide()
+
+    def set_profiling(
+            self,
+            enabled: bool,
+            output_dir: str = None,
+            format: str = "collapsed"):
+        """
+        enables sampling of the GUI thread python stacks during titlebar and grip gestures.
+        Each gesture is written to output_dir (current directory by default)
+        as collapsed stacks or speedscope JSON (format="speedscope")
+        """
+        self._end_gesture()
+        if enabled:
+            self._profiler = GestureProfiler(output_dir or os.getcwd(), format)
+        else:
+            self._profiler = None
+
+    def toggle_profiling(self):
+        self.set_profiling(self._profiler is None)
+
+    def is_profiling(self) -> bool:
+        return self._profiler is not None
+
+    def _begin_gesture(self, gesture: str):
+        if self._profiler is not None:
+            self._profiler.start(gesture)
+
+    def _end_gesture(self):
+        if self._profiler is not None:
+            self._profiler.stop()
+
+    def _grip_pressed(self):
+        self._begin_gesture("grip")
+
+    def _release_helpers(self):
+        """
+        destroys the native shadow window and drops gesture state,
+        so closed windows do not hold native handles
+        """
+        self._end_gesture()
+        if self._shadow is not None:
+            self._shadow.hide()
+            self._shadow.deleteLater()
+            self._shadow = None
+        self._shadow_side = None
+        self._is_pressed = False
+        self._press_event = None
+        self._release_event = None
+        self._last_move = None
+
+    def closeEvent(self, a0: QtGui.QCloseEvent) -> None:
+        super().closeEvent(a0)
+        if a0.isAccepted():
+            self._release_helpers()
+
+    def link_window(self, window: QtWidgets.QWidget):
+        """
+        makes top-level window move together with this one
+        when it is dragged by the titlebar.
+        Snapping fits the bounding box of the whole group to the screen area
+        """
+        if window is not self and window not in self._linked:
+            self._linked.append(window)
+
+    def unlink_window(self, window: QtWidgets.QWidget):
+        if window in self._linked:
+            self._linked.remove(window)
+
+    def linked_windows(self) -> list[QtWidgets.QWidget]:
+        return list(self._live_linked())
+
+    def _live_linked(self) -> list[QtWidgets.QWidget]:
+        self._linked = [w for w in self._linked if not sip.isdeleted(w)]
+        return self._linked
+
+    def _queue_group_move(self, delta: QtCore.QPoint):
+        if not self._linked:
+            return
+        self._group_delta += delta
+        self._group_timer.start()
+
+    def _snap_group(self, area: QtCore.QRect) -> QtCore.QRect:
+        """
+        scales the group bounding box into the snap area within windows size limits.
+        Returns geometry for this window, linked windows geometries are queued
+        """
+        members = self._live_linked()
+        if not members:
+            return area
+        origin = self.geometry().topLeft()
+        if not self._is_gestured:
+            # saves group layout to restore it later
+            self._group_normal = [
+                (w, w.geometry().topLeft() - origin, w.size()) for w in members]
+
+        windows = [self] + members
+        geometries = [w.geometry() for w in windows]
+        bbox = QtCore.QRect()
+        for geo in geometries:
+            bbox = bbox.united(geo)
+        # one scale for both axes keeps the layout, the scale range keeps every window
+        # within its size limits (current sizes are legal, so the range includes 1)
+        scale = min(area.width() / bbox.width(), area.height() / bbox.height())
+        low, high = 0.0, float("inf")
+        for window, geo in zip(windows, geometries):
+            low = max(
+                low,
+                window.minimumWidth() / geo.width(),
+                window.minimumHeight() / geo.height())
+            high = min(
+                high,
+                window.maximumWidth() / geo.width(),
+                window.maximumHeight() / geo.height())
+        scale = max(low, min(scale, high))
+        # group sticks to the screen edges the area sticks to
+        entire = self._screen.areas.entire
+        width, height = round(bbox.width() * scale), round(bbox.height() * scale)
+        x = area.x() if area.x() <= entire.x() else area.x() + area.width() - width
+        y = area.y() if area.y() <= entire.y() else area.y() + area.height() - height
+
+        def fit(window: QtWidgets.QWidget, geo: QtCore.QRect) -> QtCore.QRect:
+            left = x + round((geo.x() - bbox.x()) * scale)
+            top = y + round((geo.y() - bbox.y()) * scale)
+            right = x + round((geo.x() + geo.width() - bbox.x()) * scale)
+            bottom = y + round((geo.y() + geo.height() - bbox.y()) * scale)
+            size = QtCore.QSize(right - left, bottom - top)
+            # rounding may step over the limits by a pixel
+            size = size.expandedTo(window.minimumSize()).boundedTo(window.maximumSize())
+            return QtCore.QRect(QtCore.QPoint(left, top), size)
+
+        for window, geo in zip(members, geometries[1:]):
+            self._group_geometries[id(window)] = fit(window, geo)
+        self._group_timer.start()
+        return fit(self, geometries[0])
+
+    def _restore_group(self):
+        """returns linked windows to the sizes and offsets they had before snapping"""
+        normal, self._group_normal = self._group_normal, []
+        members = self._live_linked()
+        origin = self.geometry().topLeft()
+        for window, offset, size in normal:
+            if window in members:
+                self._group_geometries[id(window)] = QtCore.QRect(origin + offset, size)
+        self._group_timer.start()
+
+    def _flush_group_moves(self):
+        """
+        applies pending linked windows changes, one move or geometry change per window
+        """
+        delta, self._group_delta = self._group_delta, QtCore.QPoint()
+        geometries, self._group_geometries = self._group_geometries, {}
+        moved = 0
+        for window in self._live_linked():
+            geo = geometries.get(id(window))
+            if geo is not None:
+                if geo == window.geometry():
+                    continue
+                window.setGeometry(geo)
+            elif not delta.isNull():
+                window.move(window.pos() + delta)
+            else:
+                continue
+            moved += 1
+        if moved:
+            self.group_batch_count += 1
+            self.group_move_count += moved
 
     def setStyleSheet(self, styleSheet: str) -> None:
         self.centralWidget().setStyleSheet(styleSheet)
@@ -157,18 +387,73 @@ class CWindow(QtWidgets.QMainWindow):
         rect = QtCore.QRect(0, 0, self.width(), self.height())
         self.centralWidget().setGeometry(rect)
 
+    @contextmanager
+    def geometry_transaction(self):
+        """
+        groups several geometry changes into one commit.
+        Content is not relaid out and repainted until the outermost transaction ends,
+        and is not repainted at all if the window size did not change:
+
+            with window.geometry_transaction():
+                window.resize(size)
+                window.move(pos)
+        """
+        self._transaction_depth += 1
+        if self._transaction_depth == 1:
+            cw = self.centralWidget()
+            self._transaction_size = self.size()
+            self._transaction_suspended = False
+            # window layout would resize content to the intermediate geometries
+            self.layout().setEnabled(False)
+            cw.layout().setEnabled(False)
+        try:
+            yield self
+        finally:
+            self._transaction_depth -= 1
+            if self._transaction_depth == 0:
+                self._commit_geometry()
+
+    def _suspend_updates(self):
+        """disables content updates once the transaction resizes the window"""
+        if self._transaction_suspended or self.size() == self._transaction_size:
+            return
+        cw = self.centralWidget()
+        self._transaction_updates = cw.updatesEnabled()
+        self._transaction_suspended = True
+        cw.setUpdatesEnabled(False)
+
+    def _commit_geometry(self):
+        """applies the final geometry with one layout pass and at most one repaint"""
+        cw = self.centralWidget()
+        self.layout().setEnabled(True)
+        cw.layout().setEnabled(True)
+        self.update_grips()
+        # content was not resized during the transaction,
+        # so this is the only resize and layout pass
+        self._update_cw_geometry()
+        # enabling updates repaints the content, moves do not need it
+        if self._transaction_suspended:
+            cw.setUpdatesEnabled(self._transaction_updates)
+            self._transaction_suspended = False
+
     def resizeEvent(self, event):
         QtWidgets.QMainWindow.resizeEvent(self, event)
+        # transactions update grips and content once on commit
+        if self._transaction_depth:
+            self._suspend_updates()
+            return
         self.update_grips()
         self._update_cw_geometry()
 
     def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
         super().paintEvent(a0)
-        self._update_cw_geometry()
+        if not self._transaction_depth:
+            self._update_cw_geometry()
 
     def moveEvent(self, a0: QtGui.QMoveEvent) -> None:
         super().moveEvent(a0)
-        self._update_cw_geometry()
+        if not self._transaction_depth:
+            self._update_cw_geometry()
 
     def _use_shadow_geometry(self):
 
@@ -177,9 +462,10 @@ class CWindow(QtWidgets.QMainWindow):
         if not self._is_gestured:
             # saves window old size to restore it later
             self._normal_size = self.window().size()
-        self.shadow.hide()
+        self._hide_shadow()
+        # linked windows share the area with this one
+        geo = self._snap_group(self.shadow.geometry())
         self._is_gestured = True
-        geo = self.shadow.geometry()
         self.setGeometry(geo)
 
     def _move_normal(self):
@@ -197,31 +483,16 @@ class CWindow(QtWidgets.QMainWindow):
     def _fix_x_delta_after_resize(self):
 
         """
-        makes screen edge gesture exiting more intuitive
+        makes screen edge gesture exiting more intuitive:
+        the restored window is placed under the cursor at the same relative position
+        it was grabbed at
         """
         # window position after moving and resizing
         pos = self.pos()
-
-        # if window was moved right
-        if self._release_event.point.x() > self._press_event.point.x():
-            x = self._press_event.event.pos().x()
-            # delta x = window width * relative cursor position when it was pressed
-            x -= int(self.width() * self._press_event.relative_pos[0])
-            pos.setX(x)
-
-        # if window was moved left
-        else:
-            # up to this point, the _release_event characteristics
-            # have been computed relative to the old window geometry.
-            # Updates them
-            self._release_event.parse_event()
-            # rdx = relative delta x = difference between
-            # cursor relative position to the old window geometry and the new one
-            rdx = abs(self._press_event.relative_pos[0] - self._release_event.relative_pos[0])
-            # delta x = window width * rdx
-            dx = int(self.width()*rdx)
-            pos.setX(pos.x() + dx)
-
+        # cursor x inside the window = titlebar offset + window width * relative press position
+        offset = self.title_bar.mapTo(self, QtCore.QPoint(0, 0)).x()
+        offset += int(self.width() * self._press_event.relative_pos[0])
+        pos.setX(self._release_event.point.x() - offset)
         self.move(pos)
 
     def _restore_normal_size(self):
@@ -238,20 +509,39 @@ class CWindow(QtWidgets.QMainWindow):
         window moving implementation
         """
 
-        # if user wants to resize window with screen edge gesture
-        if self.shadow.isVisible():
-            self._use_shadow_geometry()
-            return
+        pos = self.pos()
+        snapped = self._is_shadow_visible()
+        gestured = self._is_gestured
+
+        with self.geometry_transaction():
+
+            # if user wants to resize window with screen edge gesture
+            if snapped:
+                self._use_shadow_geometry()
 
-        # straight moving
-        self._move_normal()
-        if self._is_gestured:
-            self._restore_normal_size()
-            self._is_gestured = False
+            # straight moving
+            else:
+                self._move_normal()
+                if self._is_gestured:
+                    self._restore_normal_size()
+                    self._is_gestured = False
+
+        # linked windows are fitted to the area by _snap_group,
+        # leave the area together or follow by the same delta
+        if not snapped:
+            if gestured and self._group_normal:
+                self._restore_group()
+            else:
+                self._queue_group_move(self.pos() - pos)
 
     def _titlebar_mouse_pressed(self, a0: QtGui.QMouseEvent) -> None:
+        self._begin_gesture("titlebar")
         self._is_pressed = True
+        # window could be moved to another screen or screen scale could change
+        self._screen.set_screen(self.screen())
         self._press_event = EventParser(self, a0)
+        self._last_move = self._press_event
+        self._velocity = (0.0, 0.0)
         self.setCursor(QtCore.Qt.CursorShape.ClosedHandCursor)
 
     def _is_fullscreen_gesture(self, event: EventParser) -> bool:
@@ -314,8 +604,8 @@ class CWindow(QtWidgets.QMainWindow):
         """
         implements "shrink_as_possibple" option
         """
-        # input
-        area = event.screen_area
+        # input (copied, screen areas are shared between events)
+        area = QtCore.QRect(event.screen_area)
         ah, aw, ax, ay = area.height(), area.width(), area.x(), area.y()
         mh, mw = self.minimumHeight(), self.minimumWidth()
         dx, dy = 0, 0
@@ -340,30 +630,66 @@ class CWindow(QtWidgets.QMainWindow):
         # output
         return area
 
-    def _show_shadow(self, event: EventParser):
+    def _get_shadow_area(self, event: EventParser) -> QtCore.QRect | None:
         """
-        shows window shadow using user settings
+        returns shadow geometry using user settings or None if shadow is skipped
         """
         # skip (or not to skip) the shadow
         if self._skip_shadow(event):
-            return
+            return None
         # resize the shadow
         if self.gesture_mode == modes.GestureResizeModes.shrink_as_possible:
-            area = self._get_appropriate_area(event)
-        else:
-            area = event.screen_area
-        # draw the shadow
-        self.shadow.show_(area)
+            return self._get_appropriate_area(event)
+        return event.screen_area
+
+    def _show_shadow(self, event: EventParser):
+        """
+        shows window shadow using user settings
+        """
+        area = self._get_shadow_area(event)
+        if area is not None:
+            self.shadow.show_(area)
+            self._shadow_side = event.side
+
+    def _prearm_shadow(self, event: EventParser):
+        """
+        prepares the shadow if cursor is heading to the screen edge
+        """
+        if not event.side:
+            return
+        area = self._get_shadow_area(event)
+        if area is not None:
+            self.shadow.prepare_(area)
+
+    def _update_velocity(self, event: EventParser):
+        last, self._last_move = self._last_move, event
+        if last is None:
+            return
+        dt = event.timestamp - last.timestamp
+        if dt <= 0:
+            return
+        delta = event.point - last.point
+        # smoothing damps jitter of single events
+        vx, vy = self._velocity
+        self._velocity = (
+            (vx + delta.x() / dt) / 2,
+            (vy + delta.y() / dt) / 2)
 
     def _titlebar_mouse_moved(self, a0: QtGui.QMouseEvent) -> None:
         if self._is_pressed:
             # if pressed, checks that user moved window to the screen edge
             # and shows the shadow to indicate target window geometry
+            self.title_bar.begin_cached_render()
             parser = EventParser(self, a0)
+            self._update_velocity(parser)
+            # edges of the shown shadow use wider zones to avoid flicker at the zone boundaries
+            if self._is_shadow_visible() and self._shadow_side is not None:
+                parser.parse_event(self._shadow_side, self.snap_release_margin)
             if parser.side and parser.screen_area:
                 self._show_shadow(parser)
             else:
-                self.shadow.hide()
+                self._hide_shadow()
+                self._prearm_shadow(parser.predict(self._velocity, self.snap_lookahead))
 
     def _titlebar_mouse_released(self, a0: QtGui.QMouseEvent) -> None:
         # saves event info
@@ -371,9 +697,31 @@ class CWindow(QtWidgets.QMainWindow):
         # launches custom window moving implementation
         if self._is_pressed:
             self._move_via_gesture()
+        self.title_bar.end_cached_render()
         # drop defaults
         self._is_pressed = False
         self.setCursor(QtCore.Qt.CursorShape.ArrowCursor)
+        self._end_gesture()
+
+
+class _TitleBarCache(QtWidgets.QWidget):
+
+    """
+    Overlay painting the cached titlebar pixmap
+    """
+
+    def __init__(self, titlebar: QtWidgets.QFrame):
+        QtWidgets.QWidget.__init__(self, titlebar)
+        # opaque overlay excludes titlebar children from painting
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_OpaquePaintEvent)
+        self.setAttribute(QtCore.Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.pixmap = QtGui.QPixmap()
+        self.hide()
+
+    def paintEvent(self, a0: QtGui.QPaintEvent) -> None:
+        painter = QtGui.QPainter(self)
+        painter.drawPixmap(0, 0, self.pixmap)
+        painter.end()
 
 
 class TitleBar(QtWidgets.QFrame):
@@ -382,6 +730,9 @@ class TitleBar(QtWidgets.QFrame):
     Custom window title bar. Provides moving for frameless window
     """
 
+    # paints titlebar pixmap during window drags and snaps instead of repainting its children
+    render_cache = False
+
     def __init__(
             self,
             cwindow: CWindow,
@@ -395,6 +746,51 @@ class TitleBar(QtWidgets.QFrame):
                 QtWidgets.QSizePolicy.Policy.Fixed)
             )
         self.cwindow = cwindow
+        self._cache = _TitleBarCache(self)
+
+    def invalidate_cache(self):
+        """
+        re-renders the cached pixmap while it is served.
+        Animated children should call it when their look changes during gestures
+        """
+        if self._cache.isVisible():
+            self._render_cache()
+
+    def _render_cache(self):
+        # hidden overlay is not included in the grabbed pixmap
+        self._cache.hide()
+        rect = QtCore.QRect(self.mapTo(self.cwindow, QtCore.QPoint(0, 0)), self.size())
+        self._cache.pixmap = self.cwindow.grab(rect)
+        self._cache.setGeometry(self.rect())
+        self._cache.raise_()
+        self._cache.show()
+
+    def begin_cached_render(self):
+        """
+        starts serving the cached pixmap instead of the titlebar contents.
+        Contents could change between gestures, so the pixmap is rendered anew
+        """
+        if self.render_cache and not self._cache.isVisible():
+            self._render_cache()
+
+    def end_cached_render(self):
+        """shows the live titlebar contents again"""
+        self._cache.hide()
+
+    def childEvent(self, a0: QtCore.QChildEvent) -> None:
+        super().childEvent(a0)
+        # events may come before the overlay is created
+        if hasattr(self, "_cache") and a0.child() is not self._cache:
+            self.invalidate_cache()
+
+    def changeEvent(self, a0: QtCore.QEvent) -> None:
+        super().changeEvent(a0)
+        if hasattr(self, "_cache"):
+            self.invalidate_cache()
+
+    def resizeEvent(self, a0: QtGui.QResizeEvent) -> None:
+        super().resizeEvent(a0)
+        self.invalidate_cache()
 
     def mousePressEvent(self, a0: QtGui.QMouseEvent) -> None:
         self.cwindow._titlebar_mouse_pressed(a0)
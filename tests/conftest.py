@@ -0,0 +1,20 @@
+import importlib.util
+import os
+
+import pytest
+
+# tests create real windows, the offscreen platform is used unless another one is forced
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+OFFSCREEN = os.environ["QT_QPA_PLATFORM"] == "offscreen"
+
+if importlib.util.find_spec("PyQt6") is None:
+    collect_ignore_glob = ["test_*.py"]
+
+
+@pytest.fixture(scope="session")
+def app():
+    if not OFFSCREEN:
+        pytest.skip("window tests require QT_QPA_PLATFORM=offscreen")
+    from PyQt6 import QtWidgets
+    application = QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+    yield application
@@ -0,0 +1,76 @@
+"""
+replayable titlebar gesture traces and measurements over them
+"""
+
+from dataclasses import dataclass
+
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtTest import QTest
+
+LEFT = QtCore.Qt.MouseButton.LeftButton
+
+# trace point: (delay since previous point in ms, global x, global y)
+Trace = list[tuple[int, int, int]]
+
+
+@dataclass
+class Frame():
+    time: int
+    shadow_created: bool
+    shadow_visible: bool
+
+
+def linear(start: tuple[int, int], end: tuple[int, int], steps: int, delay: int) -> Trace:
+    (x0, y0), (x1, y1) = start, end
+    return [
+        (delay, x0 + (x1 - x0) * i // steps, y0 + (y1 - y0) * i // steps)
+        for i in range(steps + 1)]
+
+
+def replay(window, trace: Trace, release: bool = True) -> list[Frame]:
+    """
+    drags window titlebar along the trace: the first point presses,
+    the last one releases. Returns shadow state after every point
+    """
+    app = QtWidgets.QApplication.instance()
+    titlebar = window.title_bar
+    frames, time = [], 0
+
+    def local(x, y):
+        return titlebar.mapFromGlobal(QtCore.QPoint(x, y))
+
+    _, x, y = trace[0]
+    QTest.mousePress(titlebar, LEFT, pos=local(x, y))
+    for delay, x, y in trace[1:]:
+        QTest.mouseMove(titlebar, local(x, y), delay)
+        app.processEvents()
+        time += delay
+        shadow = window._shadow
+        frames.append(Frame(
+            time,
+            shadow is not None and shadow.testAttribute(
+                QtCore.Qt.WidgetAttribute.WA_WState_Created),
+            window._is_shadow_visible()))
+    if release:
+        QTest.mouseRelease(titlebar, LEFT, pos=local(x, y))
+        app.processEvents()
+    return frames
+
+
+def time_to_shadow(frames: list[Frame]) -> int | None:
+    """trace time when the shadow was shown first"""
+    return next((frame.time for frame in frames if frame.shadow_visible), None)
+
+
+def time_to_prepare(frames: list[Frame]) -> int | None:
+    """trace time when the shadow native window was created"""
+    return next((frame.time for frame in frames if frame.shadow_created), None)
+
+
+def shadow_toggles(frames: list[Frame]) -> int:
+    visible, toggles = False, 0
+    for frame in frames:
+        if frame.shadow_visible != visible:
+            visible = frame.shadow_visible
+            toggles += 1
+    return toggles
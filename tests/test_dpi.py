@@ -0,0 +1,107 @@
+import os
+import subprocess
+import sys
+
+import pytest
+from PyQt6 import QtCore
+
+from cwindow.parsers import ScreenParser
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# scale factor is read on QApplication creation, so every factor runs in its own process
+SNAP_SCRIPT = """
+import sys
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtTest import QTest
+app = QtWidgets.QApplication([])
+import cwindow
+from gesture_traces import linear, replay
+
+
+class Window(cwindow.CWindow):
+    resizes = 0
+
+    def resizeEvent(self, event):
+        Window.resizes += 1
+        super().resizeEvent(event)
+
+
+window = Window()
+window.setMinimumSize(100, 100)
+window.show()
+ratio = window.screen().devicePixelRatio()
+for name, x in (("left", 0), ("right", window.screen().geometry().right())):
+    window._is_gestured = False
+    window.setGeometry(150, 150, 200, 150)
+    QTest.qWait(20)
+    start = window.title_bar.mapToGlobal(QtCore.QPoint(100, 10))
+    Window.resizes = 0
+    replay(window, linear((start.x(), start.y()), (x, 200), 30, 5))
+    QTest.qWait(20)
+    area = getattr(window._screen.areas, name)
+    # device position of the screen split
+    split = area.width() if name == "left" else area.x()
+    print(name, Window.resizes, window.geometry() == area, split * ratio)
+"""
+
+
+@pytest.mark.parametrize("factor", ["1", "1.25", "1.5", "1.75"])
+def test_snap_resizes_once(factor):
+    env = dict(
+        os.environ,
+        QT_QPA_PLATFORM="offscreen",
+        QT_SCALE_FACTOR=factor,
+        PYTHONPATH=os.pathsep.join([ROOT, os.path.join(ROOT, "tests")]))
+    result = subprocess.run(
+        [sys.executable, "-c", SNAP_SCRIPT],
+        env=env, capture_output=True, text=True, check=True)
+    lines = [line.split() for line in result.stdout.splitlines()]
+    assert [line[0] for line in lines] == ["left", "right"]
+    for name, resizes, exact, split in lines:
+        assert resizes == "1", name
+        assert exact == "True", name
+        # screen split lands on a device pixel
+        assert float(split).is_integer(), name
+
+
+def test_screen_areas_tile_without_gaps(app):
+    screen = app.primaryScreen()
+    areas = ScreenParser(screen).areas
+    assert areas.left.united(areas.right) == areas.entire
+    assert not areas.left.intersects(areas.right)
+    assert areas.top.united(areas.bottom) == areas.entire
+    assert not areas.top.intersects(areas.bottom)
+
+
+def test_parsers_do_not_share_areas(app):
+    screen = app.primaryScreen()
+    first, second = ScreenParser(screen), ScreenParser(screen)
+    first.areas.left.setWidth(1)
+    assert second.areas.left != first.areas.left
+    assert ScreenParser(screen).areas.left == second.areas.left
+
+
+class _Screen():
+    """screen stand-in with a given geometry"""
+
+    def __init__(self, width: int):
+        self._geometry = QtCore.QRect(0, 0, width, 100)
+
+    def geometry(self) -> QtCore.QRect:
+        return self._geometry
+
+    def devicePixelRatio(self) -> float:
+        return 1.0
+
+    def name(self) -> str:
+        return "stand-in"
+
+
+def test_cache_is_bounded(app, monkeypatch):
+    monkeypatch.setattr(ScreenParser, "_cache", {})
+    parser = ScreenParser(app.primaryScreen())
+    for width in range(100, 100 + ScreenParser.cache_size * 2):
+        parser.set_screen(_Screen(width))
+        assert parser.areas.entire.width() == width
+    assert len(ScreenParser._cache) == ScreenParser.cache_size
@@ -0,0 +1,103 @@
+import pytest
+from PyQt6 import QtCore
+from PyQt6.QtTest import QTest
+
+import cwindow
+from gesture_traces import linear, replay, shadow_toggles, time_to_prepare, time_to_shadow
+
+
+@pytest.fixture
+def window(app):
+    window = cwindow.CWindow()
+    window.setMinimumSize(100, 100)
+    window.setGeometry(300, 300, 300, 200)
+    window.show()
+    app.processEvents()
+    yield window
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def _grab_point(window) -> tuple[int, int]:
+    point = window.title_bar.mapToGlobal(QtCore.QPoint(150, 10))
+    return point.x(), point.y()
+
+
+def _approach_frames(window, lookahead: int):
+    window.snap_lookahead = lookahead
+    window._is_gestured = False
+    window.setGeometry(300, 300, 300, 200)
+    x, y = _grab_point(window)
+    # 2 px/ms towards the left screen edge
+    return replay(window, linear((x, y), (0, y), x // 10, 5))
+
+
+def test_shadow_is_prepared_before_the_edge_zone(window):
+    predicted = _approach_frames(window, 80)
+    # without prediction the native shadow window is created when shown
+    window._release_helpers()
+    unpredicted = _approach_frames(window, 0)
+    assert time_to_prepare(unpredicted) == time_to_shadow(unpredicted)
+    assert time_to_prepare(predicted) < time_to_prepare(unpredicted)
+    # the shadow is shown when the cursor enters the edge zone in both runs:
+    # pre-arming saves native window creation, not trace time
+    assert time_to_shadow(predicted) == time_to_shadow(unpredicted)
+
+
+def test_slow_approach_is_not_predicted(window):
+    x, y = _grab_point(window)
+    # about 0.4 px/ms: prediction does not reach the edge zone
+    frames = replay(window, linear((x, y), (60, y), 10, 100))
+    assert time_to_prepare(frames) is None
+
+
+def _jitter_trace(window):
+    x, y = _grab_point(window)
+    trace = linear((x, y), (8, y), 20, 5)
+    # cursor shakes around the 5 px edge zone boundary
+    trace += [(5, 3 if i % 2 else 8, y) for i in range(1, 21)]
+    return trace
+
+
+def test_boundary_jitter_toggles_shadow_once(window):
+    toggles = shadow_toggles(replay(window, _jitter_trace(window)))
+    assert toggles == 1
+
+
+def test_boundary_jitter_without_hysteresis(window):
+    window.snap_release_margin = cwindow.parsers.EventParser.edge_margin
+    toggles = shadow_toggles(replay(window, _jitter_trace(window)))
+    # every boundary crossing toggles the shadow
+    assert toggles == 20
+
+
+@pytest.mark.parametrize("corner", ["top", "bottom"])
+def test_hysteresis_widens_only_shown_side_edges(window, corner):
+    x, y = _grab_point(window)
+    entire = window._screen.areas.entire
+    # inside the release margin of the other edge, outside its edge margin
+    near = entire.top() + 15 if corner == "top" else entire.bottom() - 15
+    trace = linear((x, y), (3, y), 20, 5) + [(5, 10, near)]
+    frames = replay(window, trace, release=False)
+    assert frames[-2].shadow_visible and frames[-1].shadow_visible
+    QTest.mouseRelease(
+        window.title_bar, QtCore.Qt.MouseButton.LeftButton,
+        pos=window.title_bar.mapFromGlobal(QtCore.QPoint(10, near)))
+    # left shadow stays, the corner quarter needs the usual edge margin
+    assert window.geometry() == window._screen.areas.left
+
+
+def test_unsnapped_window_stays_under_cursor(window, app):
+    x, y = _grab_point(window)
+    replay(window, linear((x, y), (0, y), 30, 5))
+    assert window.geometry() == window._screen.areas.left
+
+    # drag out of the snapped geometry to the right
+    start = window.title_bar.mapToGlobal(QtCore.QPoint(100, 10))
+    grabbed = (start.x() - window.x()) / window.width()
+    end = (start.x() + 150, start.y() + 50)
+    replay(window, linear((start.x(), start.y()), end, 10, 5))
+    assert window.size() == QtCore.QSize(300, 200)
+    # cursor keeps its relative position in the restored window
+    assert abs((end[0] - window.x()) / window.width() - grabbed) < 0.01
@@ -0,0 +1,149 @@
+import pytest
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtTest import QTest
+
+import cwindow
+from cwindow.grips import solve_geometry
+
+Edge = QtCore.Qt.Edge
+BOTTOM_RIGHT = (Edge.BottomEdge, Edge.RightEdge)
+TOP_LEFT = (Edge.TopEdge, Edge.LeftEdge)
+
+
+class Resizable(QtWidgets.QWidget):
+    aspect_ratio: float = None
+
+
+@pytest.fixture
+def widget(app):
+    widget = Resizable()
+    widget.setGeometry(100, 100, 200, 150)
+    yield widget
+    widget.deleteLater()
+
+
+def test_max_size_is_clamped(widget):
+    widget.setMaximumSize(400, 300)
+    geo = solve_geometry(widget, QtCore.QSize(500, 500), BOTTOM_RIGHT)
+    assert geo == QtCore.QRect(100, 100, 400, 300)
+
+
+def test_min_size_is_clamped(widget):
+    widget.setMinimumSize(150, 120)
+    geo = solve_geometry(widget, QtCore.QSize(50, 50), BOTTOM_RIGHT)
+    assert geo == QtCore.QRect(100, 100, 150, 120)
+
+
+def test_single_edge_keeps_other_dimension(widget):
+    geo = solve_geometry(widget, QtCore.QSize(260, 500), (Edge.RightEdge,))
+    assert geo == QtCore.QRect(100, 100, 260, 150)
+
+
+def test_aspect_ratio_follows_bigger_change(widget):
+    widget.aspect_ratio = 2
+    widget.setGeometry(100, 100, 200, 100)
+    # height changed by 50 (100 px of width), width by 10
+    geo = solve_geometry(widget, QtCore.QSize(210, 150), BOTTOM_RIGHT)
+    assert geo == QtCore.QRect(100, 100, 300, 150)
+    # width changed by 100, height by 10 (20 px of width)
+    geo = solve_geometry(widget, QtCore.QSize(300, 110), BOTTOM_RIGHT)
+    assert geo == QtCore.QRect(100, 100, 300, 150)
+
+
+def test_aspect_ratio_side_grip(widget):
+    widget.aspect_ratio = 2
+    widget.setGeometry(100, 100, 200, 100)
+    geo = solve_geometry(widget, QtCore.QSize(200, 130), (Edge.BottomEdge,))
+    assert geo == QtCore.QRect(100, 100, 260, 130)
+
+
+def test_size_increment_from_base_size(widget):
+    widget.setSizeIncrement(10, 10)
+    widget.setBaseSize(5, 5)
+    geo = solve_geometry(widget, QtCore.QSize(237, 148), BOTTOM_RIGHT)
+    assert geo == QtCore.QRect(100, 100, 235, 145)
+
+
+def test_size_increment_stays_within_limits(widget):
+    # no increment step lands in the 103..108 range
+    widget.setSizeIncrement(10, 10)
+    widget.setMinimumSize(103, 103)
+    widget.setMaximumSize(108, 108)
+    geo = solve_geometry(widget, QtCore.QSize(104, 104), BOTTOM_RIGHT)
+    assert geo.size() == QtCore.QSize(108, 108)
+
+    widget.aspect_ratio = 1
+    geo = solve_geometry(widget, QtCore.QSize(104, 104), BOTTOM_RIGHT)
+    assert geo.size() == QtCore.QSize(108, 108)
+
+
+def test_left_and_top_grips_anchor_opposite_edges(widget):
+    geo = solve_geometry(widget, QtCore.QSize(250, 180), TOP_LEFT)
+    assert geo == QtCore.QRect(50, 70, 250, 180)
+    # clamped size keeps the right and bottom edges too
+    widget.setMaximumSize(220, 160)
+    geo = solve_geometry(widget, QtCore.QSize(250, 180), TOP_LEFT)
+    assert geo == QtCore.QRect(80, 90, 220, 160)
+    assert (geo.right(), geo.bottom()) == (widget.geometry().right(), widget.geometry().bottom())
+
+
+class ResizeCounter(QtCore.QObject):
+
+    def __init__(self):
+        QtCore.QObject.__init__(self)
+        self.count = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == QtCore.QEvent.Type.Resize:
+            self.count += 1
+        return False
+
+
+def _top_left(geo: QtCore.QRect) -> tuple[int, int]:
+    return geo.left(), geo.top()
+
+
+def _bottom_right(geo: QtCore.QRect) -> tuple[int, int]:
+    return geo.right(), geo.bottom()
+
+
+# top left grip anchors the bottom right corner and vice versa
+@pytest.mark.parametrize("index, step, anchor", [(0, -10, _bottom_right), (2, 10, _top_left)])
+def test_corner_grip_drag_sets_geometry_once_per_resize(app, index, step, anchor):
+    window = cwindow.CWindow()
+    window.setMinimumSize(100, 100)
+    window.setMaximumSize(330, 230)
+    window.setGeometry(300, 300, 300, 200)
+    window.show()
+    QTest.qWait(20)
+    anchored = anchor(window.geometry())
+
+    calls = []
+    set_geometry = window.setGeometry
+
+    def counting_set_geometry(*args):
+        calls.append(args)
+        set_geometry(*args)
+
+    window.setGeometry = counting_set_geometry
+    resizes = ResizeCounter()
+    window.installEventFilter(resizes)
+    grip = window.corner_grips[index]
+    left = QtCore.Qt.MouseButton.LeftButton
+    press = QtCore.QPoint(6, 6)
+    QTest.mousePress(grip, left, pos=press)
+    # the grip follows the resized corner, so every move is 10 px away from the grip
+    for _ in range(5):
+        QTest.mouseMove(grip, press + QtCore.QPoint(step, step))
+        app.processEvents()
+    QTest.mouseRelease(grip, left, pos=press)
+    app.processEvents()
+
+    # 30 px to the max size: three applied resizes, the last two moves change nothing
+    assert window.size() == QtCore.QSize(330, 230)
+    assert len(calls) == 3
+    assert resizes.count == 3
+    assert anchor(window.geometry()) == anchored
+    window.close()
+    window.deleteLater()
+    app.processEvents()
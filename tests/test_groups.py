@@ -0,0 +1,141 @@
+import pytest
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtTest import QTest
+
+import cwindow
+from gesture_traces import linear, replay
+
+
+class EventCounter(QtCore.QObject):
+
+    def __init__(self, event_type: QtCore.QEvent.Type):
+        QtCore.QObject.__init__(self)
+        self.event_type = event_type
+        self.count = 0
+
+    def eventFilter(self, obj, event):
+        if event.type() == self.event_type:
+            self.count += 1
+        return False
+
+
+@pytest.fixture
+def group(app):
+    leader = cwindow.CWindow()
+    leader.setMinimumSize(100, 100)
+    leader.setGeometry(200, 200, 300, 200)
+    members = [QtWidgets.QWidget(), cwindow.CWindow()]
+    members[0].setWindowFlags(QtCore.Qt.WindowType.FramelessWindowHint)
+    members[0].setGeometry(500, 200, 100, 200)
+    members[1].setGeometry(200, 400, 400, 100)
+    for window in [leader] + members:
+        window.show()
+    for member in members:
+        leader.link_window(member)
+    QTest.qWait(20)
+    yield leader, members
+    for window in [leader] + members:
+        window.close()
+        window.deleteLater()
+    app.processEvents()
+
+
+def _drag(leader, to: tuple[int, int] = None, by: tuple[int, int] = None):
+    start = leader.title_bar.mapToGlobal(QtCore.QPoint(150, 10))
+    end = to or (start.x() + by[0], start.y() + by[1])
+    replay(leader, linear((start.x(), start.y()), end, 20, 5))
+    QTest.qWait(20)
+
+
+def _bbox(windows) -> QtCore.QRect:
+    bbox = QtCore.QRect()
+    for window in windows:
+        bbox = bbox.united(window.geometry())
+    return bbox
+
+
+def test_members_move_once_per_drag(group):
+    leader, members = group
+    counters = [EventCounter(QtCore.QEvent.Type.Move) for _ in members]
+    for member, counter in zip(members, counters):
+        member.installEventFilter(counter)
+
+    _drag(leader, by=(40, 30))
+    assert leader.pos() == QtCore.QPoint(240, 230)
+    assert [m.pos() for m in members] == [QtCore.QPoint(540, 230), QtCore.QPoint(240, 430)]
+    assert [c.count for c in counters] == [1, 1]
+    assert leader.group_batch_count == 1
+    assert leader.group_move_count == 2
+
+
+def _overlaps(windows) -> bool:
+    geometries = [w.geometry() for w in windows]
+    return any(
+        a.intersects(b) for i, a in enumerate(geometries) for b in geometries[i + 1:])
+
+
+@pytest.mark.parametrize("side", ["left", "right"])
+def test_snap_fits_group_bounding_box(group, side):
+    leader, members = group
+    screen = leader._screen.areas.entire
+    _drag(leader, to=(screen.left() if side == "left" else screen.right(), 300))
+    area = getattr(leader._screen.areas, side)
+    bbox = _bbox([leader] + members)
+    # group fills the area width and sticks to the screen edge
+    assert area.contains(bbox)
+    assert bbox.width() == area.width()
+    assert bbox.top() == area.top()
+    assert (bbox.left() if side == "left" else bbox.right()) == getattr(area, side)()
+    # relative layout is kept: member on the right, member below
+    assert members[0].x() == leader.x() + leader.width()
+    assert members[1].y() == leader.y() + leader.height()
+
+
+def test_snap_scales_group_uniformly(group):
+    leader, members = group
+    # 500x300 group is scaled by 0.8 into the 400 px wide area
+    members[0].setGeometry(500, 200, 200, 200)
+    QTest.qWait(20)
+    _drag(leader, to=(0, 300))
+    area = leader._screen.areas.left
+    assert _bbox([leader] + members) == QtCore.QRect(area.topLeft(), QtCore.QSize(400, 240))
+    assert leader.size() == QtCore.QSize(240, 160)
+    # square member stays square instead of stretching to the area height
+    assert members[0].size() == QtCore.QSize(160, 160)
+    assert members[1].size() == QtCore.QSize(320, 80)
+    assert not _overlaps([leader] + members)
+
+
+def test_snap_keeps_size_limits(group):
+    leader, members = group
+    leader.setMinimumSize(300, 200)
+    members[0].setFixedSize(200, 200)
+    QTest.qWait(20)
+    sizes = [w.size() for w in [leader] + members]
+    _drag(leader, to=(0, 300))
+    area = leader._screen.areas.left
+    # 500 px of minimal widths do not fit the 400 px area: the group is not scaled down
+    assert [w.size() for w in [leader] + members] == sizes
+    assert not _overlaps([leader] + members)
+    assert _bbox([leader] + members).topLeft() == area.topLeft()
+    assert members[0].x() == leader.x() + leader.width()
+
+
+def test_unsnap_restores_group_layout(group):
+    leader, members = group
+    offsets = [m.pos() - leader.pos() for m in members]
+    sizes = [m.size() for m in members]
+    _drag(leader, to=(0, 300))
+
+    _drag(leader, by=(150, 50))
+    assert leader.size() == QtCore.QSize(300, 200)
+    assert [m.size() for m in members] == sizes
+    assert [m.pos() - leader.pos() for m in members] == offsets
+
+
+def test_plain_drag_does_not_repaint_members(group):
+    leader, members = group
+    paints = EventCounter(QtCore.QEvent.Type.Paint)
+    members[1].content.installEventFilter(paints)
+    _drag(leader, by=(40, 30))
+    assert paints.count == 0
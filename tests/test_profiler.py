@@ -0,0 +1,98 @@
+import json
+import sys
+import time
+
+import pytest
+from PyQt6 import QtCore
+from PyQt6.QtTest import QTest
+
+import cwindow
+from cwindow.profiler import GestureProfiler
+
+
+def _busy(seconds: float):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def _profile(tmp_path, format: str, seconds: float = 0.1) -> str:
+    profiler = GestureProfiler(str(tmp_path), format)
+    profiler.start("test")
+    _busy(seconds)
+    return profiler.stop()
+
+
+def test_speedscope_weights_follow_wall_time(tmp_path):
+    with open(_profile(tmp_path, "speedscope")) as file:
+        profile = json.load(file)["profiles"][0]
+    busy = [
+        weight for sample, weight in zip(profile["samples"], profile["weights"])
+        if sample]
+    # sampled time matches the busy loop, not the nominal interval times samples number
+    assert 80 <= profile["endValue"] <= 130
+    assert sum(busy) == pytest.approx(profile["endValue"])
+
+
+def _read_collapsed(path: str) -> dict[str, int]:
+    with open(path) as file:
+        lines = [line.rsplit(" ", 1) for line in file.read().splitlines()]
+    return {stack: int(weight) for stack, weight in lines}
+
+
+def test_collapsed_stacks_contain_caller(tmp_path):
+    stacks = _read_collapsed(_profile(tmp_path, "collapsed"))
+    assert any("_busy" in stack for stack in stacks)
+    assert all(weight > 0 for weight in stacks.values())
+    # weights are sampled microseconds
+    assert 80_000 <= sum(stacks.values()) <= 130_000
+
+
+def _frame():
+    return sys._getframe()
+
+
+def test_collapsed_and_speedscope_weights_agree(tmp_path):
+    profiler = GestureProfiler(str(tmp_path))
+    profiler._gesture = "test"
+    for frame, elapsed in ((sys._getframe(), 0.0021), (_frame(), 0.0035), (_frame(), 0.0009)):
+        profiler._add(frame, elapsed)
+    collapsed = _read_collapsed(profiler._write())
+    profiler.format = "speedscope"
+    with open(profiler._write()) as file:
+        speedscope = json.load(file)
+    names = [frame["name"] for frame in speedscope["shared"]["frames"]]
+    profile = speedscope["profiles"][0]
+    weights = {
+        ";".join(names[index] for index in sample): round(weight * 1000)
+        for sample, weight in zip(profile["samples"], profile["weights"])}
+    assert collapsed == weights
+    assert sorted(collapsed.values()) == [2100, 4400]
+
+
+def test_memory_is_bounded(tmp_path, monkeypatch):
+    monkeypatch.setattr(GestureProfiler, "max_stacks", 1)
+    monkeypatch.setattr(GestureProfiler, "max_samples", 5)
+    profiler = GestureProfiler(str(tmp_path))
+    profiler.start("test")
+    _busy(0.05)
+    assert len(profiler._stacks) <= 1
+    profiler.stop()
+    assert profiler._samples <= 5
+
+
+def test_grip_gesture_is_profiled(app, tmp_path):
+    window = cwindow.CWindow()
+    window.setGeometry(200, 200, 300, 200)
+    window.show()
+    window.set_profiling(True, str(tmp_path), "speedscope")
+    grip = window.corner_grips[2]
+    QTest.mousePress(grip, QtCore.Qt.MouseButton.LeftButton, pos=QtCore.QPoint(5, 5))
+    _busy(0.02)
+    QTest.mouseRelease(grip, QtCore.Qt.MouseButton.LeftButton, pos=QtCore.QPoint(5, 5))
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+    files = [path.name for path in tmp_path.iterdir()]
+    assert len(files) == 1
+    assert files[0].startswith("grip-") and files[0].endswith(".speedscope.json")
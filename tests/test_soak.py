@@ -0,0 +1,59 @@
+import gc
+import os
+import resource
+
+from PyQt6 import QtCore
+
+import cwindow
+
+# opening and closing windows must not leak native windows, widgets or python objects
+CYCLES = int(os.environ.get("CWINDOW_SOAK_CYCLES", 10000))
+WARMUP = min(500, CYCLES // 10)
+
+
+def _rss() -> int:
+    """current resident set size in bytes"""
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * resource.getpagesize()
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _cycle(app):
+    window = cwindow.CWindow()
+    window.setAttribute(QtCore.Qt.WidgetAttribute.WA_DeleteOnClose)
+    window.show()
+    # shadow is created on demand, show it like a snap gesture does
+    window.shadow.show_(QtCore.QRect(0, 0, 100, 100))
+    window.close()
+    app.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete)
+    app.processEvents()
+
+
+def _snapshot(app) -> tuple[int, int, int]:
+    # helpers must be released on close, not by the garbage collector
+    widgets = len(app.topLevelWidgets())
+    gc.collect()
+    return _rss(), widgets, len(gc.get_objects())
+
+
+def test_open_close_soak(app):
+    # windows left by other tests must not be released during the soak
+    gc.collect()
+    app.sendPostedEvents(None, QtCore.QEvent.Type.DeferredDelete)
+    gc.disable()
+    try:
+        for _ in range(WARMUP):
+            _cycle(app)
+        rss0, widgets0, objects0 = _snapshot(app)
+
+        for _ in range(CYCLES - WARMUP):
+            _cycle(app)
+        rss1, widgets1, objects1 = _snapshot(app)
+    finally:
+        gc.enable()
+
+    assert widgets1 == widgets0
+    assert objects1 - objects0 < 500
+    assert rss1 - rss0 < 16 * 1024 * 1024
@@ -0,0 +1,88 @@
+import time
+
+import pytest
+from PyQt6 import QtCore, QtWidgets
+
+import cwindow
+from gesture_traces import linear, replay
+
+
+class HeavyLabel(QtWidgets.QLabel):
+    """titlebar child with expensive painting"""
+
+    def __init__(self, text: str):
+        QtWidgets.QLabel.__init__(self, text)
+        self.paint_time = 0.0
+        self.paints = 0
+
+    def paintEvent(self, a0):
+        start = time.perf_counter()
+        time.sleep(0.001)
+        super().paintEvent(a0)
+        self.paint_time += time.perf_counter() - start
+        self.paints += 1
+
+
+@pytest.fixture
+def window(app):
+    window = cwindow.CWindow()
+    window.setGeometry(300, 300, 300, 200)
+    layout = QtWidgets.QHBoxLayout(window.title_bar)
+    window.label = HeavyLabel("title")
+    layout.addWidget(window.label)
+    window.show()
+    app.processEvents()
+    yield window
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def _drag(window, steps: int = 40):
+    """drags titlebar with repaint requested on every frame, returns paint ms per frame"""
+    start = window.title_bar.mapToGlobal(QtCore.QPoint(150, 10))
+    trace = linear((start.x(), start.y()), (start.x() - 100, start.y() + 50), steps, 1)
+    original = window.title_bar.mouseMoveEvent
+
+    def move(a0):
+        original(a0)
+        window.title_bar.update()
+        window.label.update()
+
+    window.title_bar.mouseMoveEvent = move
+    QtWidgets.QApplication.instance().processEvents()
+    window.label.paint_time, window.label.paints = 0.0, 0
+    replay(window, trace)
+    return window.label.paint_time * 1000 / steps, window.label.paints
+
+
+def test_paint_time_per_frame(window):
+    uncached, uncached_paints = _drag(window)
+    window.title_bar.render_cache = True
+    cached, cached_paints = _drag(window)
+    print(
+        f"titlebar paint per frame: {uncached:.3f} ms without cache "
+        f"({uncached_paints} paints), {cached:.3f} ms with cache ({cached_paints} paints)")
+    # children are painted for the pixmap, while the overlay appears and on release,
+    # regardless of the number of frames
+    assert cached_paints <= 3
+    assert cached < uncached
+
+
+def test_cache_follows_content_changes(window, app):
+    window.title_bar.render_cache = True
+    _drag(window)
+    window.label.setText("changed")
+    app.processEvents()
+
+    window.title_bar.begin_cached_render()
+    window.title_bar.end_cached_render()
+    pixmap = window.title_bar._cache.pixmap.toImage()
+    label = window.label.grab().toImage()
+    # cached pixmap contains the current label text
+    origin = window.label.mapTo(window.title_bar, QtCore.QPoint(0, 0))
+    ratio = pixmap.devicePixelRatio()
+    part = pixmap.copy(
+        int(origin.x() * ratio), int(origin.y() * ratio),
+        label.width(), label.height())
+    assert part == label.convertToFormat(part.format())
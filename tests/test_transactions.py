@@ -0,0 +1,79 @@
+import pytest
+from PyQt6 import QtCore, QtWidgets
+from PyQt6.QtTest import QTest
+
+import cwindow
+from gesture_traces import linear, replay
+
+
+class Content(QtWidgets.QWidget):
+    """counts content resizes and repaints"""
+
+    def __init__(self):
+        QtWidgets.QWidget.__init__(self)
+        self.resizes = 0
+        self.paints = 0
+
+    def resizeEvent(self, a0):
+        self.resizes += 1
+
+    def paintEvent(self, a0):
+        self.paints += 1
+
+
+@pytest.fixture
+def window(app):
+    window = cwindow.CWindow()
+    window.setMinimumSize(100, 100)
+    window.setGeometry(300, 300, 300, 200)
+    window.probe = Content()
+    QtWidgets.QVBoxLayout(window.content).addWidget(window.probe)
+    window.show()
+    # let the first layout and paint pass finish
+    QTest.qWait(20)
+    window.probe.resizes = window.probe.paints = 0
+    yield window
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def test_resize_is_committed_once(window, app):
+    with window.geometry_transaction():
+        with window.geometry_transaction():
+            window.resize(500, 400)
+        window.resize(450, 350)
+        window.move(10, 10)
+    app.processEvents()
+    assert window.geometry() == QtCore.QRect(10, 10, 450, 350)
+    assert window.probe.resizes == 1
+    assert window.probe.paints == 1
+    assert window.centralWidget().updatesEnabled()
+
+
+def test_move_is_not_repainted(window, app):
+    with window.geometry_transaction():
+        window.move(20, 20)
+    app.processEvents()
+    assert window.probe.resizes == 0
+    assert window.probe.paints == 0
+
+
+def test_plain_drag_is_not_repainted(window, app):
+    start = window.title_bar.mapToGlobal(QtCore.QPoint(150, 10))
+    replay(window, linear((start.x(), start.y()), (start.x() + 60, start.y() + 40), 10, 5))
+    assert window.pos() == QtCore.QPoint(360, 340)
+    assert window.probe.paints == 0
+
+
+def test_unsnap_is_committed_once(window, app):
+    start = window.title_bar.mapToGlobal(QtCore.QPoint(150, 10))
+    replay(window, linear((start.x(), start.y()), (0, start.y()), 30, 5))
+    QTest.qWait(20)
+    window.probe.resizes = window.probe.paints = 0
+
+    start = window.title_bar.mapToGlobal(QtCore.QPoint(100, 10))
+    replay(window, linear((start.x(), start.y()), (start.x() + 150, start.y() + 50), 10, 5))
+    assert window.size() == QtCore.QSize(300, 200)
+    assert window.probe.resizes == 1
+    assert window.probe.paints == 1